@@ -7,3 +7,22 @@ import os
 
 SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL')
 SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+# event loop lag watchdog, logs the blocking stack when the hub stalls (see socketio_pg/monitor.py)
+EVENTLOOP_WATCHDOG = bool(os.getenv('EVENTLOOP_WATCHDOG'))
+EVENTLOOP_WATCHDOG_INTERVAL = float(os.getenv('EVENTLOOP_WATCHDOG_INTERVAL', .1))
+EVENTLOOP_LAG_THRESHOLD = float(os.getenv('EVENTLOOP_LAG_THRESHOLD', .5))
+
+# sampling profiler around hot paths, writes collapsed stacks for flamegraphs
+PROFILE_HOT_PATHS = bool(os.getenv('PROFILE_HOT_PATHS'))
+PROFILE_OUTPUT = os.getenv('PROFILE_OUTPUT', 'socketio_pg.folded')
+PROFILE_SAMPLE_INTERVAL = float(os.getenv('PROFILE_SAMPLE_INTERVAL', .005))
+PROFILE_FLUSH_INTERVAL = float(os.getenv('PROFILE_FLUSH_INTERVAL', 10))
+
+# send new subscribers the last event(s) seen on a channel right after subscribing (see socketio_pg/cache.py)
+LAST_VALUE_CACHE = bool(os.getenv('LAST_VALUE_CACHE'))
+# memory bound on cached events (parsed payloads, measured with sys.getsizeof), least recently used channels are evicted first
+LAST_VALUE_CACHE_MAX_BYTES = int(os.getenv('LAST_VALUE_CACHE_MAX_BYTES', 10 * 1024 * 1024))
+LAST_VALUE_CACHE_KEY = os.getenv('LAST_VALUE_CACHE_KEY')
+# with LAST_VALUE_CACHE_KEY, most values kept (and sent to a new subscriber) per channel
+LAST_VALUE_CACHE_MAX_KEYS = int(os.getenv('LAST_VALUE_CACHE_MAX_KEYS', 100))
@@ -12,6 +12,8 @@ from eventlet.semaphore import Semaphore
 from typing import List, Dict
 from psycopg2.extensions import quote_ident
 from contextlib import contextmanager
+from socketio_pg.monitor import Monitor
+from socketio_pg.cache import LastValueCache
 
 log = logging.getLogger(__name__)
 
@@ -42,7 +44,16 @@ class PubSub():
         self.conn_sem = Semaphore()
         self.read_timeout = .3
         self.cursor = self.conn.cursor()
-
+        self.monitor = Monitor(app.config)
+        self.last_values = None
+        if app.config.get('LAST_VALUE_CACHE'):
+            self.last_values = LastValueCache(
+                max_bytes=app.config.get('LAST_VALUE_CACHE_MAX_BYTES', 10 * 1024 * 1024),
+                key=app.config.get('LAST_VALUE_CACHE_KEY'),
+                max_keys=app.config.get('LAST_VALUE_CACHE_MAX_KEYS', 100),
+            )
+
+        self.monitor.start()
         self.listen()
 
     def disconnect(self):
@@ -50,6 +61,7 @@ class PubSub():
         if self.listen_greenthread:
             self.listen_greenthread.kill()
             self.listen_greenthread = None
+        self.monitor.stop()
         with self.conn_sem:
             self.conn.close()
 
@@ -112,6 +124,9 @@ class PubSub():
         if len(self.listeners[event_name]) == 0:
             self._unsubscribe(event_name)
             del self.listeners[event_name]
+            # no longer receiving updates, cached values would go stale
+            if self.last_values:
+                self.last_values.discard(event_name)
 
     def subscribe(self, event_name: EventName, queue: ListenerQueue):
         """Listen for event_name notifications and send a message on queue when received."""
@@ -126,6 +141,12 @@ class PubSub():
         subscription = {'queue': queue, 'event_name': event_name}
         return subscription
 
+    def cached_events(self, event_name: EventName) -> List[dict]:
+        """Get the last events received on event_name, if the last-value cache is enabled."""
+        if not self.last_values:
+            return []
+        return self.last_values.get(self.sanitize_event_name(event_name))
+
     def _subscribe(self, event_name: EventName):
         """Stop waiting for events, listen for event_name, begin listening to events again."""
         # cur = self.conn.cursor()
@@ -170,13 +191,22 @@ class PubSub():
             except Exception as ex:
                 log.error(f"Failed to parse payload as JSON: {payload}.\nError: {ex}")
 
+        event = {
+            'channel': event_name,
+            'payload': payload,
+        }
         listeners = self.listeners[event_name]
         self._debug(f"{len(listeners)} listeners found for {event_name}")
         for queue in listeners:
-            queue.put_nowait({
-                'channel': event_name,
-                'payload': payload,
-            })
+            queue.put_nowait(event)
+
+        if self.last_values:
+            # the cache must never break delivery
+            try:
+                self.last_values.update(event_name, event)
+            except Exception as ex:
+                log.error(f"Failed to cache last value for {event_name}: {ex}")
+                self.last_values.discard(event_name)
 
     def publish(self, event_name, payload=None):
         """Publish message on channel."""
@@ -223,7 +253,8 @@ class PubSub():
             self._check_for_notifies()
 
     def _check_for_notifies(self):
-        self.conn.poll()  # get available notifications
-        while self.conn.notifies:
-            n = self.conn.notifies.pop()
-            self.handle_event(n)
+        with self.monitor.profile('check_for_notifies'):
+            self.conn.poll()  # get available notifications
+            while self.conn.notifies:
+                n = self.conn.notifies.pop()
+                self.handle_event(n)
@@ -0,0 +1,130 @@
+"""Last-value cache of channel events.
+
+Lets new subscribers receive the current state of a channel immediately instead of
+waiting for the next NOTIFY (or querying the database for it).
+
+Configure via app config:
+    LAST_VALUE_CACHE = True
+    LAST_VALUE_CACHE_MAX_BYTES = 10 * 1024 * 1024  # bound on memory used by cached events, as measured by sys.getsizeof
+    LAST_VALUE_CACHE_KEY = 'id'  # optional: keep the last value per payload[key] instead of per channel
+    LAST_VALUE_CACHE_MAX_KEYS = 100  # most values kept per channel with LAST_VALUE_CACHE_KEY, oldest evicted first
+"""
+
+import sys
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+Event = Dict[str, Any]
+
+
+def sizeof(obj) -> int:
+    """Estimate memory used by a parsed JSON value, including everything it contains.
+
+    Walks with an explicit stack, so deeply nested payloads can't hit the recursion limit.
+    """
+    size = 0
+    stack = [obj]
+    while stack:
+        obj = stack.pop()
+        size += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, list):
+            stack.extend(obj)
+    return size
+
+
+class LastValueCache():
+    def __init__(self, max_bytes: int = 10 * 1024 * 1024, key: Optional[str] = None, max_keys: int = 100) -> None:
+        """Create cache bounded to roughly max_bytes of memory, evicting least recently used channels.
+
+        With key set, at most max_keys values are kept per channel, so a new subscriber
+        is never sent more than max_keys cached events.
+        """
+        self.max_bytes = max_bytes
+        self.key = key
+        self.max_keys = max_keys
+        # channel => (payload key => (event, size)), ordered least to most recently used
+        self.channels: 'OrderedDict[str, OrderedDict[Any, tuple]]' = OrderedDict()
+        self.size = 0
+
+    def _event_key(self, event: Event):
+        """Get the value to keep separate last values by, if configured."""
+        if not self.key:
+            return None
+        payload = event.get('payload')
+        if not isinstance(payload, dict):
+            return None
+        value = payload.get(self.key)
+        if value is None or isinstance(value, (str, int, float, bool)):
+            return value
+        return str(value)  # unhashable values like lists
+
+    def _channel_size(self, channel: str) -> int:
+        """Memory used by a channel's name and entry table, counted once per channel."""
+        return sys.getsizeof(channel) + sys.getsizeof(OrderedDict())
+
+    def _entry_size(self, event: Event, event_key) -> int:
+        """Memory used by one cached event, not counting the channel name it shares."""
+        size = sys.getsizeof(event) + sizeof(event_key)
+        size += sum(sizeof(k) + (sizeof(v) if k != 'channel' else 0) for k, v in event.items())
+        return size
+
+    def update(self, channel: str, event: Event) -> None:
+        """Store event as the latest value on channel."""
+        event_key = self._event_key(event)
+        size = self._entry_size(event, event_key)
+        new_channel_size = 0 if channel in self.channels else self._channel_size(channel)
+        if size + new_channel_size > self.max_bytes:
+            # would evict everything else and still not fit; at least don't serve the stale value
+            self._remove(channel, event_key)
+            return
+
+        if new_channel_size:
+            self.channels[channel] = OrderedDict()
+            self.size += new_channel_size
+        entries = self.channels[channel]
+        self.channels.move_to_end(channel)
+        if event_key in entries:
+            self.size -= entries[event_key][1]
+        entries[event_key] = (event, size)
+        entries.move_to_end(event_key)
+        self.size += size
+        while len(entries) > self.max_keys:
+            _, (_, evicted_size) = entries.popitem(last=False)
+            self.size -= evicted_size
+        self._evict()
+
+    def _remove(self, channel: str, event_key) -> None:
+        """Drop a single cached event, and its channel if it was the last one."""
+        entries = self.channels.get(channel)
+        if not entries or event_key not in entries:
+            return
+        self.size -= entries.pop(event_key)[1]
+        if not entries:
+            self.discard(channel)
+
+    def _evict(self):
+        """Drop least recently used entries until we are within max_bytes."""
+        while self.size > self.max_bytes and self.channels:
+            channel, entries = next(iter(self.channels.items()))
+            _, (_, size) = entries.popitem(last=False)
+            self.size -= size
+            if not entries:
+                self.discard(channel)
+
+    def get(self, channel: str) -> List[Event]:
+        """Get cached events on channel, oldest first."""
+        entries = self.channels.get(channel)
+        if not entries:
+            return []
+        self.channels.move_to_end(channel)
+        return [event for event, _ in entries.values()]
+
+    def discard(self, channel: str) -> None:
+        """Forget channel, e.g. when we stop listening and it can go stale."""
+        if channel not in self.channels:
+            return
+        entries = self.channels.pop(channel)
+        self.size -= self._channel_size(channel) + sum(size for _, size in entries.values())
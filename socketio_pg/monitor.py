@@ -0,0 +1,224 @@
+"""Event loop lag watchdog and hot-path sampling profiler.
+
+Everything runs on a single eventlet hub, so one blocking call stalls every socket.
+The watchdog detects this and logs the stack of whatever blocked the hub.
+The profiler samples stacks while inside hot-path sections and writes them in
+collapsed-stack format, suitable for flamegraph.pl or speedscope.
+
+Configure via app config:
+    EVENTLOOP_WATCHDOG = True
+    EVENTLOOP_WATCHDOG_INTERVAL = .1  # seconds between hub heartbeats
+    EVENTLOOP_LAG_THRESHOLD = .5  # log when the hub is blocked at least this long
+    PROFILE_HOT_PATHS = True
+    PROFILE_SAMPLE_INTERVAL = .005  # seconds between stack samples
+    PROFILE_OUTPUT = 'socketio_pg.folded'  # collapsed stacks, rewritten every PROFILE_FLUSH_INTERVAL
+    PROFILE_FLUSH_INTERVAL = 10
+"""
+
+import collections
+import logging
+import sys
+import traceback
+import eventlet
+from eventlet import patcher
+from contextlib import contextmanager
+from typing import Counter, List, Optional
+
+# real OS threads and sleep; these must keep running while the hub is blocked
+real_threading = patcher.original('threading')
+real_time = patcher.original('time')
+
+log = logging.getLogger(__name__)
+
+
+class LagWatchdog():
+    def __init__(self, interval: float = .1, threshold: float = .5) -> None:
+        """Watch for the eventlet hub being blocked for longer than threshold seconds."""
+        self.interval = interval
+        self.threshold = threshold
+        self.heartbeat = real_time.monotonic()
+        self.hub_thread_id = real_threading.get_ident()
+        self.heartbeat_greenthread = None
+        self.watch_thread = None
+        self.running = False
+
+    def start(self):
+        """Begin sending hub heartbeats and watching them from an OS thread."""
+        if self.running:
+            return
+        self.running = True
+        self.heartbeat = real_time.monotonic()
+        self.heartbeat_greenthread = eventlet.spawn(self._beat)
+        self.watch_thread = real_threading.Thread(target=self._watch, name='eventloop-watchdog', daemon=True)
+        self.watch_thread.start()
+
+    def stop(self):
+        """Stop watching."""
+        self.running = False
+        if self.heartbeat_greenthread:
+            self.heartbeat_greenthread.kill()
+            self.heartbeat_greenthread = None
+        if self.watch_thread:
+            self.watch_thread.join(timeout=self.interval * 2)
+            self.watch_thread = None
+
+    def _beat(self):
+        """Greenthread: record a heartbeat every interval and measure scheduling lag."""
+        try:
+            while self.running:
+                before = real_time.monotonic()
+                eventlet.sleep(self.interval)
+                now = real_time.monotonic()
+                self.heartbeat = now
+                lag = now - before - self.interval
+                if lag >= self.threshold:
+                    log.warning(f"Event loop lag: hub was {lag:.3f}s late scheduling the watchdog")
+        except eventlet.greenlet.GreenletExit:
+            return
+
+    def _watch(self):
+        """OS thread: if heartbeats stop, dump the stack currently running on the hub thread."""
+        reported_heartbeat = None
+        while self.running:
+            real_time.sleep(self.interval)
+            heartbeat = self.heartbeat
+            stalled = real_time.monotonic() - heartbeat
+            if stalled < self.threshold or heartbeat == reported_heartbeat:
+                continue
+            # only report each stall once
+            reported_heartbeat = heartbeat
+            frame = sys._current_frames().get(self.hub_thread_id)
+            stack = ''.join(traceback.format_stack(frame)) if frame else '(no frame)\n'
+            log.error(f"Event loop blocked for {stalled:.3f}s, blocking stack:\n{stack}")
+
+
+class HotPathProfiler():
+    def __init__(self, output: Optional[str] = None, sample_interval: float = .005, flush_interval: float = 10) -> None:
+        """Sample stacks of the hub thread while inside a profiled section."""
+        self.output = output
+        self.sample_interval = sample_interval
+        self.flush_interval = flush_interval
+        self.hub_thread_id = real_threading.get_ident()
+        self.samples: Counter[str] = collections.Counter()
+        self.section: Optional[str] = None
+        self.sampler_thread = None
+        self.running = False
+
+    @contextmanager
+    def profile(self, section: str):
+        """Attribute samples taken during this block to section.
+
+        Sections should not yield to the hub, otherwise samples of other greenthreads
+        running meanwhile are attributed to them. This is not enforced; emit_green's
+        section wraps emit(), which may yield depending on the socketio transport, so
+        its samples can include other greenthreads' frames.
+        Nested sections keep the outermost name; the inner functions still show up
+        in the sampled frames.
+        """
+        if not self.running or self.section is not None:
+            yield
+            return
+        self.section = section
+        try:
+            yield
+        finally:
+            self.section = None
+
+    def start(self):
+        """Start the sampling OS thread."""
+        if self.running:
+            return
+        self.running = True
+        self.sampler_thread = real_threading.Thread(target=self._sample, name='hot-path-profiler', daemon=True)
+        self.sampler_thread.start()
+
+    def stop(self):
+        """Stop sampling and write out collected stacks."""
+        self.running = False
+        if self.sampler_thread:
+            # make sure the sampler isn't mid-flush before writing the final output
+            self.sampler_thread.join(timeout=max(self.sample_interval * 2, 1))
+            self.sampler_thread = None
+        self.flush()
+
+    def _sample(self):
+        last_flush = real_time.monotonic()
+        while self.running:
+            real_time.sleep(self.sample_interval)
+            section = self.section
+            if section is None:
+                continue
+            frame = sys._current_frames().get(self.hub_thread_id)
+            if frame is None:
+                continue
+            self.samples[';'.join([section] + self._frame_names(frame))] += 1
+            if real_time.monotonic() - last_flush >= self.flush_interval:
+                self.flush()
+                last_flush = real_time.monotonic()
+
+    def _frame_names(self, frame) -> List[str]:
+        """Describe frames from outermost to innermost.
+
+        Walks the frames directly; traceback.extract_stack would stat every file and
+        load source lines while holding the GIL, skewing the timings being measured.
+        """
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            names.append(f"{code.co_name} ({code.co_filename}:{frame.f_lineno})")
+            frame = frame.f_back
+        names.reverse()
+        return names
+
+    def flush(self):
+        """Write samples in collapsed-stack format (one "frame;frame;frame count" per line)."""
+        if not self.output:
+            return
+        samples = self.samples.copy()
+        try:
+            with open(self.output, 'w') as f:
+                for stack, count in samples.items():
+                    f.write(f"{stack} {count}\n")
+        except OSError as ex:
+            log.error(f"Failed to write profile samples to {self.output}: {ex}")
+
+
+class Monitor():
+    def __init__(self, config) -> None:
+        """Set up watchdog and profiler from application config."""
+        self.watchdog: Optional[LagWatchdog] = None
+        self.profiler: Optional[HotPathProfiler] = None
+        if config.get('EVENTLOOP_WATCHDOG'):
+            self.watchdog = LagWatchdog(
+                interval=config.get('EVENTLOOP_WATCHDOG_INTERVAL', .1),
+                threshold=config.get('EVENTLOOP_LAG_THRESHOLD', .5),
+            )
+        if config.get('PROFILE_HOT_PATHS'):
+            self.profiler = HotPathProfiler(
+                output=config.get('PROFILE_OUTPUT', 'socketio_pg.folded'),
+                sample_interval=config.get('PROFILE_SAMPLE_INTERVAL', .005),
+                flush_interval=config.get('PROFILE_FLUSH_INTERVAL', 10),
+            )
+
+    def start(self):
+        """Start whichever of the watchdog and profiler are enabled."""
+        if self.watchdog:
+            self.watchdog.start()
+        if self.profiler:
+            self.profiler.start()
+
+    def stop(self):
+        """Stop watchdog and profiler."""
+        if self.watchdog:
+            self.watchdog.stop()
+        if self.profiler:
+            self.profiler.stop()
+
+    @contextmanager
+    def profile(self, section: str):
+        """Profile a hot-path section, if profiling is enabled."""
+        if not self.profiler:
+            yield
+            return
+        with self.profiler.profile(section):
+            yield
@@ -0,0 +1,92 @@
+"""Test last-value cache.
+
+Run with: pytest socketio_pg/tests/test_cache.py
+"""
+
+import json
+from unittest import TestCase
+from socketio_pg.cache import LastValueCache
+
+
+def _make_event(channel, **payload):
+    """Build an event like PubSub.handle_event does."""
+    return {'channel': channel, 'payload': payload}
+
+
+class LastValueCacheTestCase(TestCase):
+    def test_last_value(self):
+        """Keep only the most recent event per channel."""
+        cache = LastValueCache()
+        cache.update('a', _make_event('a', v=1))
+        size = cache.size
+        cache.update('a', _make_event('a', v=2))
+        self.assertEqual(cache.get('a'), [_make_event('a', v=2)], "Didn't keep latest value")
+        self.assertEqual(cache.get('b'), [], "Got value for unknown channel")
+        self.assertEqual(cache.size, size, "Size not updated on replace")
+
+    def test_per_key(self):
+        """Keep most recent event per payload key."""
+        cache = LastValueCache(key='id')
+        cache.update('a', _make_event('a', id=1, v=1))
+        cache.update('a', _make_event('a', id=2, v=1))
+        cache.update('a', _make_event('a', id=1, v=2))
+        self.assertEqual(cache.get('a'), [_make_event('a', id=2, v=1), _make_event('a', id=1, v=2)], "Didn't keep value per key")
+
+    def test_size_counts_parsed_payload(self):
+        """Measure the memory held by the cached payload, not just its JSON length."""
+        cache = LastValueCache()
+        cache.update('a', _make_event('a', items=list(range(100))))
+        self.assertGreater(cache.size, len(str(list(range(100)))) * 2, "Didn't measure parsed payload")
+
+    def test_lru_eviction(self):
+        """Evict least recently used channel when over memory bound."""
+        cache = LastValueCache()
+        cache.update('a', _make_event('a'))
+        cache.max_bytes = cache.size * 2  # room for two channels
+        cache.update('b', _make_event('b'))
+        cache.get('a')  # a is now more recently used than b
+        cache.update('c', _make_event('c'))
+        self.assertEqual(cache.get('b'), [], "Didn't evict least recently used channel")
+        self.assertTrue(cache.get('a'), "Evicted recently used channel")
+        self.assertTrue(cache.get('c'), "Evicted new channel")
+        self.assertLessEqual(cache.size, cache.max_bytes, "Exceeded memory bound")
+
+    def test_oversized_value(self):
+        """Drop the stale value when the latest one is too large to cache."""
+        cache = LastValueCache(max_bytes=2000)
+        cache.update('a', _make_event('a', v=1))
+        cache.update('a', _make_event('a', v='x' * 5000))
+        self.assertEqual(cache.get('a'), [], "Served stale value after oversized update")
+        self.assertEqual(cache.size, 0, "Size not updated when dropping stale value")
+
+        cache = LastValueCache(max_bytes=2000, key='id')
+        cache.update('a', _make_event('a', id=1, v=1))
+        cache.update('a', _make_event('a', id=2, v=1))
+        cache.update('a', _make_event('a', id=1, v='x' * 5000))
+        self.assertEqual(cache.get('a'), [_make_event('a', id=2, v=1)], "Served stale value for key after oversized update")
+
+    def test_max_keys(self):
+        """Evict the oldest key when a channel has too many."""
+        cache = LastValueCache(key='id', max_keys=2)
+        for i in range(3):
+            cache.update('a', _make_event('a', id=i))
+        self.assertEqual(cache.get('a'), [_make_event('a', id=1), _make_event('a', id=2)], "Didn't evict oldest key")
+        size = cache.size
+        cache.discard('a')
+        self.assertEqual(cache.size, 0, f"Size not updated on key eviction, was {size}")
+
+    def test_deeply_nested_payload(self):
+        """Measure a small but deeply nested payload without hitting the recursion limit."""
+        payload = json.loads('[' * 500 + ']' * 500)  # valid NOTIFY payload, well under 8000 bytes
+        event = {'channel': 'a', 'payload': payload}
+        cache = LastValueCache()
+        cache.update('a', event)
+        self.assertIs(cache.get('a')[0], event, "Didn't cache nested payload")
+
+    def test_discard(self):
+        """Forget channel values."""
+        cache = LastValueCache()
+        cache.update('a', _make_event('a'))
+        cache.discard('a')
+        self.assertEqual(cache.get('a'), [])
+        self.assertEqual(cache.size, 0)
@@ -0,0 +1,76 @@
+"""Test event loop watchdog and hot-path profiler.
+
+Run with: pytest socketio_pg/tests/test_monitor.py
+"""
+
+import os
+import re
+import tempfile
+from unittest import TestCase
+import eventlet
+from socketio_pg.monitor import LagWatchdog, HotPathProfiler, real_time
+
+
+def block_hub(seconds):
+    """Block the hub thread without yielding."""
+    real_time.sleep(seconds)
+
+
+def busy_work(seconds):
+    """Spin on the hub thread without yielding."""
+    end = real_time.monotonic() + seconds
+    while real_time.monotonic() < end:
+        pass
+
+
+class LagWatchdogTestCase(TestCase):
+    def test_logs_blocking_stack(self):
+        """Log the blocking stack once when the hub is blocked past the threshold."""
+        watchdog = LagWatchdog(interval=.02, threshold=.1)
+        watchdog.start()
+        try:
+            eventlet.sleep(.05)  # let heartbeats start
+            with self.assertLogs('socketio_pg.monitor', level='ERROR') as logs:
+                block_hub(.4)
+                eventlet.sleep(.05)
+        finally:
+            watchdog.stop()
+
+        self.assertEqual(len(logs.records), 1, "Didn't log blocked hub exactly once")
+        message = logs.records[0].getMessage()
+        self.assertIn("Event loop blocked", message)
+        self.assertIn("block_hub", message, "Didn't log blocking stack")
+        self.assertIsNone(watchdog.watch_thread, "Didn't stop watch thread")
+
+
+class HotPathProfilerTestCase(TestCase):
+    def setUp(self):
+        """Create profile output file."""
+        super().setUp()
+        fd, self.output = tempfile.mkstemp(suffix='.folded')
+        os.close(fd)
+
+    def tearDown(self):
+        """Remove profile output file."""
+        os.unlink(self.output)
+        super().tearDown()
+
+    def test_collapsed_stacks(self):
+        """Write samples taken inside a profiled section as collapsed stacks."""
+        profiler = HotPathProfiler(output=self.output, sample_interval=.001, flush_interval=60)
+        profiler.start()
+        with profiler.profile('hot'):
+            busy_work(.2)
+        busy_work(.05)  # outside of any section, shouldn't be sampled
+        profiler.stop()
+
+        with open(self.output) as f:
+            lines = f.read().splitlines()
+        self.assertTrue(lines, "Didn't write any samples")
+        for line in lines:
+            self.assertRegex(line, r'^hot;.+ \d+$', "Sample isn't a collapsed stack line")
+        busy_lines = [line for line in lines if re.search(r';busy_work \([^;]+\) \d+$', line)]
+        self.assertTrue(busy_lines, "Didn't sample profiled function")
+        self.assertTrue(all('test_collapsed_stacks' in line for line in busy_lines), "Didn't record caller frames")
+        total = sum(int(line.rsplit(' ', 1)[1]) for line in lines)
+        self.assertEqual(total, sum(profiler.samples.values()), "Sample counts don't match")
@@ -10,10 +10,13 @@ import eventlet
 
 
 class PubSubTestCase(TestCase):
+    app_config: dict = {}
+
     def setUp(self):
         """Initialize pubsub websocket server."""
         super().setUp()
         app = create_app()
+        app.config.update(self.app_config)
         dsn = app.config['SQLALCHEMY_DATABASE_URI']
         self.ws = SocketServer(app=app, dsn=dsn, test=True)
         self.pubsub = self.ws.pubsub
@@ -93,3 +96,48 @@ class PubSubTestCase(TestCase):
             self.assertTrue(result, "Failed to complete load subtest")
 
         pool.waitall()
+
+
+class LastValueCacheTestCase(PubSubTestCase):
+    """Run the pubsub tests with the last-value cache enabled, plus cache behavior."""
+
+    app_config = {'LAST_VALUE_CACHE': True}
+
+    def _connect_and_subscribe(self, channel_name):
+        client = self.ws.socketio.test_client(self.app)
+        client.get_received()  # server_hello
+        client.emit('subscribe', {'channel': channel_name})
+        return client, client.get_received()
+
+    def _publish(self, client, channel_name, payload):
+        client.emit('test_pub', {'channel': channel_name, 'payload': payload})
+        self.ws.socketio.sleep(.2)  # let notification be delivered
+
+    def test_cached_event_on_subscribe(self):
+        """Send a new subscriber the last event on the channel right after subscribed."""
+        channel_name = 'test_lvc'
+        client_a, received = self._connect_and_subscribe(channel_name)
+        self.assertEqual([m['name'] for m in received], ['subscribed'], "Got cached event on empty channel")
+
+        self._publish(client_a, channel_name, {'v': 1})
+        received = client_a.get_received()
+        self.assertEqual([m['name'] for m in received], ['published', 'event'], "Didn't get published event")
+        self.assertEqual(self.pubsub.cached_events(channel_name), [{'channel': channel_name, 'payload': {'v': 1}}],
+                         "handle_event didn't update cache")
+
+        # second subscriber gets the current state without waiting for the next NOTIFY
+        client_b, received = self._connect_and_subscribe(channel_name)
+        self.assertEqual([m['name'] for m in received], ['subscribed', 'event'], "Didn't get cached event after subscribed")
+        self.assertEqual(received[1]['args'][0], {'channel': channel_name, 'payload': {'v': 1}}, "Got wrong cached event")
+
+        # later events arrive once, after the cached one
+        self._publish(client_a, channel_name, {'v': 2})
+        received = client_b.get_received()
+        self.assertEqual([m['name'] for m in received], ['event'], "Didn't get exactly one new event")
+        self.assertEqual(received[0]['args'][0]['payload'], {'v': 2}, "Got stale or duplicate event")
+
+        # once nobody listens the cache would go stale, so it's dropped
+        client_b.disconnect()
+        self.assertTrue(self.pubsub.cached_events(channel_name), "Dropped cache while still listening")
+        client_a.disconnect()
+        self.assertEqual(self.pubsub.cached_events(channel_name), [], "Didn't drop cache on unsubscribe")
@@ -89,18 +89,26 @@ class SocketServer():
                 """Wait for events on the queue and emit them to client."""
                 while 1:
                     n = q.get()  # block on waiting for item from queue
-                    req_ctx.push()  # restore request context
-                    emit('event', n)  # send event to client (has channel and payload fields)
-                    req_ctx.pop()  # done with request context
+                    # emit() may yield to the hub, so samples here can include other greenthreads
+                    with self.pubsub.monitor.profile('emit_green'):
+                        req_ctx.push()  # restore request context
+                        emit('event', n)  # send event to client (has channel and payload fields)
+                        req_ctx.pop()  # done with request context
 
             # subscribe and queue emit callbacks, async
             subscription = self.pubsub.subscribe(channel, q)
-            listen_gthread = eventlet.spawn(emit_green, q, req_ctx)
-            self.listen_gthreads[request.sid].append(listen_gthread)
+            # anything newer than the cached state will arrive on q
+            cached_events = self.pubsub.cached_events(channel)
             self.subscriptions[request.sid].append(subscription)
             log.info(f"Client {current_user} subscribed to {channel}")
             emit('subscribed', {'channel': channel})
 
+            # send current channel state before spawning emitter so it can't overtake it
+            for event in cached_events:
+                emit('event', event)
+            listen_gthread = eventlet.spawn(emit_green, q, req_ctx)
+            self.listen_gthreads[request.sid].append(listen_gthread)
+
         if enable_test_page:
             @self.app.route('/socket-test')
             def socket_test():